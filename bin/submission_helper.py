@@ -8,7 +8,6 @@ import yaml
 import json
 import logging
 import xml.etree.ElementTree as ET
-import xml.dom.minidom as minidom  # Import minidom for pretty-printing
 import math  # Required for isnan check
 import time
 import shlex
@@ -16,7 +15,6 @@ import subprocess
 from typing import Optional, List
 import pandas as pd
 from abc import ABC, abstractmethod
-import paramiko
 import ftplib
 from nameparser import HumanName
 from zipfile import ZipFile
@@ -24,17 +22,43 @@ import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 
-def setup_logging(log_file="submission.log", level=logging.INFO):
+class BufferedFileHandler(logging.FileHandler):
+	""" FileHandler that writes through a large buffer instead of flushing after every record.
+		Buffered records reach the file when the buffer fills, on flush(), at logging.shutdown(),
+		or straight away for records at flush_level (WARNING) and above, like MemoryHandler.
+	"""
+	def __init__(self, filename, mode="a", buffer_size=131072, flush_level=logging.WARNING, **kwargs):
+		self.buffer_size = buffer_size
+		self.flush_level = flush_level
+		super().__init__(filename, mode=mode, **kwargs)
+	def _open(self):
+		return open(self.baseFilename, self.mode, buffering=self.buffer_size, encoding=self.encoding, errors=self.errors)
+	def emit(self, record):
+		if self.stream is None:
+			self.stream = self._open()
+		try:
+			self.stream.write(self.format(record) + self.terminator)
+			if record.levelno >= self.flush_level:
+				self.flush()
+		except Exception:
+			self.handleError(record)
+
+def setup_logging(log_file="submission.log", level=logging.INFO, buffered=False):
 	if not logging.getLogger().handlers:
 		logging.basicConfig(
 			level=level,
 			format="[%(levelname)s] %(message)s",
 			handlers=[
-				logging.FileHandler(log_file, mode="a"),
+				BufferedFileHandler(log_file, mode="a") if buffered else logging.FileHandler(log_file, mode="a"),
 				logging.StreamHandler()
 			]
 		)
 
+def flush_logging():
+	""" Write out any buffered log records (e.g. before forking worker processes) """
+	for handler in logging.getLogger().handlers:
+		handler.flush()
+
 def symlink_or_copy(src, dst, copy=False):
 	if not os.path.exists(dst):
 		if copy:
@@ -42,6 +66,16 @@ def symlink_or_copy(src, dst, copy=False):
 		else:
 			os.symlink(os.path.abspath(src), dst)
 
+def hardlink_or_copy(src, dst):
+	""" Hardlink src to dst when both are on the same filesystem, otherwise copy the file
+	"""
+	try:
+		os.link(src, dst)
+	except FileExistsError:
+		raise
+	except OSError:
+		shutil.copyfile(src, dst)
+
 def get_compound_extension(filename):
 	"""Return the full extension (up to 2 suffixes) of a file, like '.fastq.gz'."""
 	parts = os.path.basename(filename).split('.')
@@ -353,6 +387,8 @@ class GetParams:
 		parser.add_argument("--sra", help="Optional flag to run SRA submission", action="store_const", default=False, const=True)
 		parser.add_argument("--wastewater", action="store_true", help="Prepare submission with wastewater specific metadata")
 		parser.add_argument("--dry_run", action="store_true", help="Print what would be uploaded but don't connect or transfer files")
+		parser.add_argument("--verbose", action="store_true", help="Write DEBUG level messages to the log")
+		parser.add_argument("--threads", type=int, default=1, help="Number of GenBank samples to prepare in parallel")
 		return parser
 
 class SubmissionConfigParser:
@@ -552,6 +588,7 @@ class SFTPClient:
 		self.sftp = None
 		self.ssh = None
 	def connect(self):
+		import paramiko  # deferred: slow to import and only needed for SFTP uploads
 		try:
 			self.ssh = paramiko.SSHClient()
 			self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -722,11 +759,9 @@ class XMLSubmission(ABC):
 		ET.SubElement(contact_name, 'Last').text = self.safe_text(self.submission_config['Submitter']['Name']['Last'])
 	def finalize_xml(self):
 		xml_output_path = os.path.join(self.outdir, "submission.xml")
-		rough_string = ET.tostring(self.submission_root, encoding='utf-8')
-		reparsed = minidom.parseString(rough_string)
-		pretty_xml = reparsed.toprettyxml(indent="  ")
-		with open(xml_output_path, 'w', encoding='utf-8') as f:
-			f.write(pretty_xml)
+		# Indent in place and stream the tree to disk (no reparse into a second minidom DOM)
+		ET.indent(self.submission_root, space="  ")
+		ET.ElementTree(self.submission_root).write(xml_output_path, encoding='utf-8', xml_declaration=True)
 		logging.info(f"Batch XML generated at {xml_output_path}")
 		self.xml_output_path = xml_output_path
 	def add_sample(self, sample, metadata_df, platform=None):
@@ -883,7 +918,6 @@ class GenbankSubmission(XMLSubmission, Submission):
 		self.top_metadata = parser.extract_top_metadata()
 		self.biosample_metadata = parser.extract_biosample_metadata()
 		self.genbank_metadata = parser.extract_genbank_metadata()
-		os.makedirs(self.outdir, exist_ok=True)
 
 		print("Top metadata:", self.top_metadata)
 		print("Biosample metadata:", self.biosample_metadata)
@@ -1214,7 +1248,7 @@ class GenbankSubmission(XMLSubmission, Submission):
 		elif self.sample.species in ['virus','rsv','mpxv']:
 			self._workflow_virus()
 		else:
-			logging.debug(f"{self.sample.species} must be one of: sars, flu, bacteria, eukaryote, virus")
+			logging.warning(f"{self.sample.species} must be one of: sars, flu, bacteria, eukaryote, virus")
 
 	# Functions for running table2asn
 	def get_gff_locus_tag(self):
@@ -1290,5 +1324,5 @@ class GenbankSubmission(XMLSubmission, Submission):
 			result = subprocess.run(cmd, check=True, capture_output=True, text=True)
 			logging.info(f"table2asn output: {result.stdout}")
 		except subprocess.CalledProcessError as e:
-			logging.debug(f"Error running table2asn: {e.stderr}")
+			logging.error(f"Error running table2asn: {e.stderr}")
 			raise
\ No newline at end of file
@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 import os
-import shutil
+import sys
 import logging
 import pandas as pd
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from submission_helper import (
 	GetParams,
 	SubmissionConfigParser,
@@ -11,26 +13,87 @@ from submission_helper import (
 	SRASubmission,
 	GenbankSubmission,
 	get_compound_extension,
-	setup_logging
+	hardlink_or_copy,
+	setup_logging,
+	flush_logging
 )
 
 def prepare_sra_fastqs(samples, outdir, copy=False):
+	# list outdir once so files staged by an earlier run are skipped without a syscall each
+	existing = {entry.name for entry in os.scandir(outdir)}
 	for sample in samples:
 		if sample.fastq1 and sample.fastq2:
-			ext1 = get_compound_extension(sample.fastq1)
-			ext2 = get_compound_extension(sample.fastq2)
-			dest_fq1 = os.path.join(outdir, f"{sample.sample_id}_R1{ext1}")
-			dest_fq2 = os.path.join(outdir, f"{sample.sample_id}_R2{ext2}")
-			if not os.path.exists(dest_fq1):
-				if copy:
-					shutil.copy(sample.fastq1, dest_fq1)
-				else:
-					os.symlink(sample.fastq1, dest_fq1)
-			if not os.path.exists(dest_fq2):
-				if copy:
-					shutil.copy(sample.fastq2, dest_fq2)
-				else:
-					os.symlink(sample.fastq2, dest_fq2)
+			for read, src in (('R1', sample.fastq1), ('R2', sample.fastq2)):
+				dest_name = f"{sample.sample_id}_{read}{get_compound_extension(src)}"
+				if dest_name in existing:
+					continue
+				dest = os.path.join(outdir, dest_name)
+				# let the link/copy call report an existing file instead of stat-ing it first
+				try:
+					if copy:
+						hardlink_or_copy(src, dest)
+					else:
+						os.symlink(src, dest)
+				except FileExistsError:
+					pass
+
+# --sample keys mapped to Sample keyword arguments (modules/local/prep_submission writes nanopore reads as 'nnp')
+SAMPLE_ARG_KEYS = {
+	'sample_id': 'sample_id',
+	'fq1': 'fastq1',
+	'fq2': 'fastq2',
+	'nnp': 'nanopore',
+	'nanopore': 'nanopore',
+	'fasta': 'fasta_file',
+	'gff': 'annotation_file'
+}
+
+def build_sample(arg, batch_id, species, databases):
+	""" Build a Sample from one --sample value ('sample_id=...,fq1=...,fq2=...')
+	"""
+	fields = {}
+	for item in arg.split(','):
+		key, sep, value = item.partition('=')
+		if not sep:
+			raise ValueError(f"Malformed --sample value '{arg}': '{item}' is not a key=value pair")
+		if key in SAMPLE_ARG_KEYS:
+			fields[SAMPLE_ARG_KEYS[key]] = value
+	return Sample(batch_id=batch_id, species=species, databases=databases, **fields)
+
+def init_genbank_worker(log_file, log_level):
+	""" Pool initializer: make sure the worker logs to prep_submission.log
+		(under fork the parent's handlers are inherited and setup_logging is a no-op; under spawn it adds them)
+	"""
+	setup_logging(log_file=log_file, level=log_level, buffered=True)
+
+def run_genbank_submission(job):
+	""" Prepare the GenBank submission for a single sample (runs in a worker process)
+	"""
+	s, md, params, config, output_root, identifier = job
+	submission_dir = os.path.join(output_root, 'genbank', s.sample_id)
+	# the genbank/ parent is created once by main_prepare
+	try:
+		os.mkdir(submission_dir)
+	except FileExistsError:
+		pass
+	try:
+		gb = GenbankSubmission(
+			parameters=params,
+			submission_config=config,
+			metadata_df=md,         # this sample's rows only (MetadataParser reads row 0)
+			outdir=submission_dir,
+			submission_mode=params['submission_mode'],
+			submission_dir=submission_dir,
+			type='genbank',
+			samples=[s],            # GenbankSubmission stores but never reads the batch list
+			sample=s,               # class expects one sample
+			accession_id=None,
+			identifier=identifier
+		)
+		gb.genbank_submission_driver()
+	finally:
+		# pool workers exit without logging.shutdown(), so write out their buffered records here
+		flush_logging()
 
 def main_prepare():
 	# parse exactly the same CLI args you already have
@@ -39,32 +102,31 @@ def main_prepare():
 	os.makedirs(params['outdir'], exist_ok=True)
 
 	log_file_path = os.path.join(params['outdir'], 'prep_submission.log')
-	setup_logging(log_file=log_file_path, level=logging.DEBUG)
+	log_level = logging.DEBUG if params.get('verbose') else logging.INFO
+	setup_logging(log_file=log_file_path, level=log_level, buffered=True)
 	logging.info("Started logging for preparation.")
 	
 	# load config & metadata
 	config = SubmissionConfigParser(params).load_config()
 	batch_id = os.path.splitext(os.path.basename(params['metadata_file']))[0]
-	metadata_df = pd.read_csv(params['metadata_file'], sep='\t')
+	# parse in one pass (no chunked dtype guessing); sample names are read as a categorical
+	# (categories are always parsed as strings, so they match the ids passed via --sample)
+	metadata_df = pd.read_csv(params['metadata_file'], sep='\t', low_memory=False, dtype={'sample_name': 'category'})
+	# index metadata rows by sample name once, rather than masking the whole table per sample
+	md_by_id = {name: group for name, group in metadata_df.groupby('sample_name', sort=False, observed=True)}
 	identifier = params['identifier']
 	submission_dir = 'Test' if params['test'] else 'Production'
 	output_root = params['outdir']
 
 	# build sample objects
-	samples = []
-	for s in params['sample']:
-		d = dict(item.split('=') for item in s.split(','))
-		samples.append(Sample(
-			sample_id   = d['sample_id'],
-			batch_id	= batch_id,
-			fastq1	  = d.get('fq1'),
-			fastq2	  = d.get('fq2'),
-			nanopore	= d.get('nanopore'),
-			species	 = params['species'],
-			databases   = [db for db in params if params[db] and db in ['biosample','sra','genbank']],
-			fasta_file  = d.get('fasta'),
-			annotation_file = d.get('gff')
-		))
+	enabled_dbs = [db for db in ('biosample', 'sra', 'genbank') if params.get(db)]
+	samples = [build_sample(s, batch_id, params['species'], enabled_dbs) for s in params['sample']]
+	# every sample needs its own metadata rows; fail here rather than deep inside MetadataParser
+	missing_ids = [s.sample_id for s in samples if s.sample_id not in md_by_id]
+	if missing_ids:
+		raise ValueError(f"No rows in {params['metadata_file']} for sample(s): {', '.join(missing_ids)}")
+	# resolve each sample's metadata rows once and reuse them for every database below
+	sample_md = [(s, md_by_id[s.sample_id]) for s in samples]
 
 	# 1) Prepare BioSample XML + submit.ready
 	if params['biosample']:
@@ -84,19 +146,24 @@ def main_prepare():
 			wastewater=params.get('wastewater', False)
 		)
 		bs.init_xml_root()
-		for s in samples:
-			md = metadata_df[metadata_df['sample_name'] == s.sample_id]
+		for s, md in sample_md:
 			bs.add_sample(s, md)
 		bs.finalize_xml()
 		# write submit.ready
-		open(os.path.join(submission_dir,'submit.ready'),'w').close()
+		Path(submission_dir, 'submit.ready').touch()
 
 	# 2) Prepare SRA XML + submit.ready (per-platform if needed)
 	if params['sra']:
-		illum = [s for s in samples if s.fastq1 and s.fastq2]
-		nano  = [s for s in samples if s.nanopore]
+		# split samples by platform in a single pass
+		illum, nano = [], []
+		for s, md in sample_md:
+			if s.fastq1 and s.fastq2:
+				illum.append((s, md))
+			if s.nanopore:
+				nano.append((s, md))
 		platforms = (('illumina', illum), ('nanopore', nano)) if illum and nano else [(None, illum or nano)]
-		for platform, samp_list in platforms:
+		for platform, samp_md in platforms:
+			samp_list = [s for s, _ in samp_md]
 			# submission_dir needs to be unique if submitting both illumina and nanopore
 			submission_dir = os.path.join(output_root, 'sra', platform) if platform else os.path.join(output_root, 'sra')
 			os.makedirs(submission_dir, exist_ok=True)
@@ -115,34 +182,35 @@ def main_prepare():
 				wastewater=params.get('wastewater', False)
 			)
 			sra.init_xml_root()
-			for s in samp_list:
-				md = metadata_df[metadata_df['sample_name'] == s.sample_id]
+			for s, md in samp_md:
 				sra.add_sample(s, md, platform)  # existing signature
 			sra.finalize_xml()
 			# write submit.ready
-			open(os.path.join(submission_dir,'submit.ready'),'w').close()
+			Path(submission_dir, 'submit.ready').touch()
 			# copy/Symlink raw files to SRA folder
 			prepare_sra_fastqs(samp_list, submission_dir, copy=False)
 			
-	# 3) Prepare GenBank submission, per-sample
-	if params['genbank']:
-		for s in samples:
-			submission_dir = os.path.join(output_root, 'genbank', s.sample_id)
-			os.makedirs(submission_dir, exist_ok=True)
-			gb = GenbankSubmission(
-				parameters=params,
-				submission_config=config,
-				metadata_df=metadata_df,
-				outdir=submission_dir,
-				submission_mode=params['submission_mode'],
-				submission_dir=submission_dir,
-				type='genbank',
-				samples=samples,
-				sample=s,               # class expects one sample
-				accession_id=None,
-				identifier=identifier
-			)
-			gb.genbank_submission_driver()
+	# 3) Prepare GenBank submission, per-sample (each sample is independent, so run them in parallel)
+	if params['genbank'] and sample_md:
+		os.makedirs(os.path.join(output_root, 'genbank'), exist_ok=True)
+		genbank_jobs = [(s, md, params, config, output_root, identifier) for s, md in sample_md]
+		# flush before forking so workers don't inherit (and later re-write) buffered records
+		flush_logging()
+		with ProcessPoolExecutor(
+			max_workers=max(1, min(len(genbank_jobs), params['threads'])),
+			initializer=init_genbank_worker,
+			initargs=(log_file_path, log_level)
+		) as executor:
+			# consume the results so an exception in any worker is raised here
+			list(executor.map(run_genbank_submission, genbank_jobs))
+
+	logging.info("Submission preparation completed.")
 
 if __name__=="__main__":
-	main_prepare()
+	try:
+		main_prepare()
+	except Exception:
+		# record the traceback in prep_submission.log as well as on stderr; exit rather than
+		# re-raise so the interpreter doesn't print the same traceback a second time
+		logging.exception("Submission preparation failed.")
+		sys.exit(1)
@@ -55,6 +55,7 @@ process PREP_SUBMISSION {
         --outdir  ${meta.batch_id} \
         ${sample_args} \
         --submission_mode $params.submission_mode \
+        --threads $task.cpus \
         $test_flag \
         $send_submission_email \
         $sra $biosample $genbank \